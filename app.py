@@ -3,26 +3,27 @@ Solar ROI Calculator (UK)
 A simple tool to estimate solar panel savings for UK homeowners.
 
 To run locally:
-    pip install streamlit plotly pandas
+    pip install streamlit plotly numpy
     streamlit run app.py
 
 To deploy on Streamlit Cloud:
     1. Push this file to a GitHub repo as 'app.py'
-    2. Create requirements.txt with: streamlit plotly pandas
-    3. Create data/region_yield.csv with regional yield data
-    4. Create data/suppliers.csv with supplier SEG rate data
-    5. Create data/home_type_panels.csv with home type recommendations
-    6. Create results_schema_min.json with results section copy
-    7. Go to share.streamlit.io and connect your repo
+    2. Create requirements.txt with: streamlit plotly numpy
+    3. Add data_tables.py (regional yield, supplier SEG rate and home type data) and lookup_tables.py
+    4. Create results_schema_min.json with results section copy
+    5. Go to share.streamlit.io and connect your repo
 """
 
 import streamlit as st
 import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+import numpy as np
 import re
-import os
 import json
+import html
+from urllib.parse import quote
+from types import MappingProxyType
+
+from lookup_tables import load_lookup_tables
 
 # Load results schema for data-driven copy
 try:
@@ -54,18 +55,33 @@ st.set_page_config(
 
 # UK baseline constants
 BASE_YIELD = 950  # kWh per kWp per year (fallback if region not found)
+DEFAULT_REGION = ("UK Average", BASE_YIELD)  # (region_name, yield_value) for unknown postcodes
 
 # DEVELOPER NOTE: SEG rate constants
 # 4p/kWh represents the UK government's minimum guaranteed SEG rate
 # Used as conservative default when supplier is unknown or not selected
 DEFAULT_SEG_RATE = 4.0  # Minimum guaranteed SEG rate for unknown suppliers
 
+# Export-rate tiers (p/kWh): tier 0 below SEG_RATE_DECENT, 1 from SEG_RATE_DECENT,
+# 2 from SEG_RATE_GREAT. SEG_RATE_MESSAGES is indexed by tier and formatted with seg_rate.
+SEG_RATE_DECENT = 15
+SEG_RATE_GREAT = 20
+SEG_RATE_MESSAGES = (
+    "💰 **Low export rate.** At {seg_rate:.1f}p/kWh, your SEG rate is below average. Consider shopping around for better export tariffs or maximizing self-use with a battery.",
+    "💰 **Decent export rate.** At {seg_rate:.1f}p/kWh, exporting surplus energy is still worthwhile, though not as lucrative as the best tariffs available.",
+    "💰 **Great export rate!** At {seg_rate:.1f}p/kWh, exporting your surplus energy to the grid is highly profitable. You're getting good value for every kWh you don't use."
+)
+
 # DEVELOPER NOTE: Installation cost model - Option 1 (Linear Scaling)
 # Future evolution: Consider tiered costs (economies of scale), regional adjustments,
 # or more granular breakdowns (inverter size, mounting systems, labor rates by region)
 FIXED_COST = 2500  # £ baseline (scaffolding, inverter, labor)
 COST_PER_PANEL = 350  # £ variable cost per panel
 
+# Panel count range offered by the panel slider (also the sensitivity grid rows)
+MIN_PANELS = 4
+MAX_PANELS = 24
+
 # DEVELOPER NOTE: Battery constants - current model uses 5kWh as standard
 # Future expandability: capacity tiers (5kWh/10kWh), degradation modeling,
 # smart charging integration, multiple battery configurations
@@ -94,8 +110,8 @@ EV_MULTIPLIERS = {
     'actual': 1.60    # +60% for custom input
 }
 
-# Orientation multipliers
-ORIENTATION_FACTORS = {
+# Orientation multipliers (read-only)
+ORIENTATION_FACTORS = MappingProxyType({
     "South": 1.0,
     "South-East": 0.95,
     "South-West": 0.95,
@@ -104,119 +120,339 @@ ORIENTATION_FACTORS = {
     "North-East": 0.70,
     "North-West": 0.70,
     "North": 0.6
-}
+})
+
+# Roof directions in selectbox order, with factors aligned by index so the
+# calculation can read the factor by position instead of hashing the name
+ORIENTATION_OPTIONS = tuple(ORIENTATION_FACTORS)
+ORIENTATION_FACTORS_TUPLE = tuple(ORIENTATION_FACTORS.values())
+
+# Index of the default roof direction, derived so reordering the options can't desync it
+DEFAULT_ROOF_DIRECTION = "South"
+DEFAULT_ROOF_IDX = ORIENTATION_OPTIONS.index(DEFAULT_ROOF_DIRECTION)
+
+# Uppercases ASCII letters and drops spaces in a single translate() pass
+_POSTCODE_TABLE = str.maketrans({" ": None, **{c: c.upper() for c in "abcdefghijklmnopqrstuvwxyz"}})
 
 # ============================================================================
 # HELPER FUNCTIONS - DEFINED FIRST
 # ============================================================================
 
-@st.cache_data
-def load_regional_yields():
-    """Load regional yield data from CSV file."""
-    csv_path = "data/region_yield.csv"
-    
-    if os.path.exists(csv_path):
-        try:
-            df = pd.read_csv(csv_path)
-            return df
-        except Exception as e:
-            st.warning(f"Could not load regional yield data: {e}")
-            return None
-    else:
-        return None
+def postcode_area(postcode_clean):
+    """
+    Return the postcode area - the 1-2 leading letters, e.g. "EH" from "EH11AA".
+    Expects an uppercased postcode without spaces; returns "" if it has no area.
+    UK postcode grammar makes this two character checks, no regex needed.
+    """
+    if not postcode_clean or not "A" <= postcode_clean[0] <= "Z":
+        return ""
+    
+    if len(postcode_clean) > 1 and "A" <= postcode_clean[1] <= "Z":
+        return postcode_clean[:2]
+    
+    return postcode_clean[:1]
 
-def get_regional_yield(postcode):
+# DEVELOPER NOTE: Lookup helpers are deliberately uncached - each is a dict probe,
+# which costs less than hashing a Streamlit cache key, and functools.lru_cache would
+# start empty on every rerun because Streamlit re-executes this script. The tables
+# themselves are a process-wide singleton in lookup_tables.py.
+def get_regional_yield(postcode_clean, tables):
     """
-    Extract postcode prefix and look up regional yield.
+    Extract prefix from a cleaned postcode and look up regional yield.
     Returns tuple: (region_name, yield_value)
     """
-    if not postcode or postcode.strip() == "":
-        return "UK Average", BASE_YIELD
+    prefix = postcode_area(postcode_clean)
     
-    postcode_clean = postcode.strip().upper().replace(" ", "")
-    match = re.match(r'^([A-Z]{1,2})', postcode_clean)
+    if not prefix:
+        return DEFAULT_REGION
     
-    if not match:
-        return "UK Average", BASE_YIELD
+    return tables.region.get(prefix, DEFAULT_REGION)
+
+def get_seg_rate_for_supplier(supplier_name, tables):
+    """
+    Look up SEG rate for a given supplier.
+    Returns SEG rate as float.
+    """
+    supplier_data = tables.supplier
     
-    prefix = match.group(1)
-    regional_df = load_regional_yields()
+    if supplier_name not in supplier_data:
+        return 21.0
     
-    if regional_df is None:
-        return "UK Average", BASE_YIELD
+    return supplier_data[supplier_name][0]
+
+def get_min_panels_for_home_type(home_type, tables):
+    """
+    Look up minimum recommended panels for a home type.
+    Returns min_panels as int.
+    """
+    home_type_data = tables.home_type
     
-    result = regional_df[regional_df['prefix'] == prefix]
+    if home_type not in home_type_data:
+        return 8  # Default fallback
     
-    if not result.empty:
-        region = result.iloc[0]['region']
-        yield_val = result.iloc[0]['yield']
-        return region, int(yield_val)
-    else:
-        return "UK Average", BASE_YIELD
-
-@st.cache_data
-def load_supplier_data():
-    """Load energy supplier SEG rate data from CSV file."""
-    csv_path = "data/suppliers.csv"
-    
-    if os.path.exists(csv_path):
-        try:
-            df = pd.read_csv(csv_path)
-            return df
-        except Exception as e:
-            st.warning(f"Could not load supplier data: {e}")
-            return None
-    else:
-        return None
+    return home_type_data[home_type][0]
 
-def get_seg_rate_for_supplier(supplier_name):
+# ============================================================================
+# CALCULATION LOGIC
+# ============================================================================
+
+def calculate_solar_roi(num_panels, system_size_kwp, orientation_factor, shading_factor, regional_yield,
+                        region_name, home_during_day, has_battery, day_rate, seg_rate):
     """
-    Look up SEG rate for a given supplier.
-    Returns SEG rate as float.
+    Calculate solar ROI metrics based on user inputs.
+    Pure function of its arguments.
     """
-    supplier_df = load_supplier_data()
     
-    if supplier_df is None:
-        return 21.0
+    # Step 1: System size in kWp is computed once alongside the panel inputs
+    
+    # Step 2: Calculate annual generation using regional yield, orientation, and shading
+    annual_generation = system_size_kwp * regional_yield * orientation_factor * shading_factor
     
-    result = supplier_df[supplier_df['supplier'] == supplier_name]
+    # Step 3: Calculate self-use percentage
+    # DEVELOPER NOTE: Battery significantly increases self-use by storing excess daytime generation
+    self_use_percent = 0.45
+    
+    if home_during_day == "Yes":
+        self_use_percent += 0.10
     
-    if not result.empty:
-        return float(result.iloc[0]['seg_rate'])
+    if has_battery == "Yes":
+        self_use_percent += BATTERY_SELF_USE_BOOST  # 25% boost with battery
+    
+    self_use_percent = min(0.90, self_use_percent)
+    
+    # Calculate self-used and exported energy
+    self_used_kwh = annual_generation * self_use_percent
+    exported_kwh = annual_generation - self_used_kwh
+    
+    # Step 4: Calculate financial benefits
+    savings = self_used_kwh * (day_rate / 100)
+    export_income = exported_kwh * (seg_rate / 100)
+    total_annual_value = savings + export_income
+    
+    # Step 5: Calculate installation cost (scaled by panel count)
+    # DEVELOPER NOTE: Linear cost model - fixed baseline + per-panel variable cost
+    panel_install_cost = FIXED_COST + (num_panels * COST_PER_PANEL)
+    battery_install_cost = BATTERY_COST if has_battery == "Yes" else 0
+    install_cost = panel_install_cost + battery_install_cost
+    
+    # Step 6: Calculate payback period
+    if total_annual_value > 0:
+        payback_years = install_cost / total_annual_value
     else:
-        return 21.0
+        payback_years = 0
+    
+    export_percent = 1 - self_use_percent
+    
+    return {
+        'system_size_kwp': system_size_kwp,
+        'annual_generation': annual_generation,
+        'self_used_kwh': self_used_kwh,
+        'exported_kwh': exported_kwh,
+        'self_use_percent': self_use_percent,
+        'export_percent': export_percent,
+        'savings': savings,
+        'export_income': export_income,
+        'total_annual_value': total_annual_value,
+        'install_cost': install_cost,
+        'panel_install_cost': panel_install_cost,
+        'battery_install_cost': battery_install_cost,
+        'payback_years': payback_years,
+        'orientation_factor': orientation_factor,
+        'shading_factor': shading_factor,
+        'regional_yield': regional_yield,
+        'region_name': region_name
+    }
 
-@st.cache_data
-def load_home_type_data():
-    """Load home type panel recommendations from CSV file."""
-    csv_path = "data/home_type_panels.csv"
-    
-    if os.path.exists(csv_path):
-        try:
-            df = pd.read_csv(csv_path)
-            return df
-        except Exception as e:
-            st.warning(f"Could not load home type data: {e}")
-            return None
-    else:
-        return None
+def _roi_kernel(system_size_kwp, yields, orientation_factors, self_use_percent,
+                day_rate, seg_rate, install_cost):
+    """
+    Array kernel of the ROI model; inputs broadcast against each other.
+    Returns tuple: (annual_generation, total_annual_value, payback_years)
+    """
+    annual_generation = system_size_kwp * yields * orientation_factors
+    self_used_kwh = annual_generation * self_use_percent
+    exported_kwh = annual_generation - self_used_kwh
+    total_annual_value = self_used_kwh * day_rate * 0.01 + exported_kwh * seg_rate * 0.01
+    
+    # Payback is 0 when there is no annual value (matches calculate_solar_roi)
+    payback_years = install_cost / np.where(total_annual_value > 0, total_annual_value, np.inf)
+    
+    return annual_generation, total_annual_value, payback_years
 
-def get_min_panels_for_home_type(home_type):
+def calc_roi_vec(panels, panel_wattage, orientation_factors, regional_yield, shading_factor,
+                 self_use_percent, day_rate, seg_rate, battery_install_cost):
     """
-    Look up minimum recommended panels for a home type.
-    Returns min_panels as int.
+    Vectorised counterpart of calculate_solar_roi for parametric sweeps.
+    Evaluates every (panel count, orientation factor) pair in one NumPy broadcast.
+    Returns dict of arrays shaped (len(panels), len(orientation_factors)).
     """
-    home_type_df = load_home_type_data()
+    panels = np.asarray(panels, dtype=float)
+    orientation_factors = np.asarray(orientation_factors, dtype=float)
     
-    if home_type_df is None:
-        return 8  # Default fallback
+    # Column vectors vary by panel count, the row vector by orientation
+    system_size_kwp = ((panels * panel_wattage) / 1000)[:, np.newaxis]
+    install_cost = (FIXED_COST + panels * COST_PER_PANEL + battery_install_cost)[:, np.newaxis]
+    
+    annual_generation, total_annual_value, payback_years = _roi_kernel(
+        system_size_kwp, float(regional_yield * shading_factor), orientation_factors[np.newaxis, :],
+        float(self_use_percent), float(day_rate), float(seg_rate), install_cost
+    )
+    
+    return {
+        'annual_generation': annual_generation,
+        'total_annual_value': total_annual_value,
+        'install_cost': np.broadcast_to(install_cost, total_annual_value.shape),
+        'payback_years': payback_years
+    }
+
+def build_recommendations(payback_years, self_use_pct, seg_rate, day_rate, has_battery):
+    """
+    Recommendation paragraphs for the results panel, as a tuple of markdown strings.
+    Pure function of the scalars the copy depends on.
+    """
+    recommendations = []
     
-    result = home_type_df[home_type_df['home_type'] == home_type]
+    # Payback assessment
+    if payback_years < 7:
+        recommendations.append("✅ **Excellent payback period!** Your system would pay for itself in under 7 years, which is considered very good for UK solar installations. This is a solid investment.")
+    elif payback_years < 10:
+        recommendations.append("👍 **Good payback period.** Your system would pay for itself in under 10 years, making it a worthwhile long-term investment.")
+    else:
+        recommendations.append("⚠️ **Long payback period.** With a payback of over 10 years, you may want to consider adjusting your system size or waiting for better tariff rates.")
+    
+    tier = 2 if seg_rate >= SEG_RATE_GREAT else 1 if seg_rate >= SEG_RATE_DECENT else 0
     
-    if not result.empty:
-        return int(result.iloc[0]['min_panels'])
+    # Battery recommendation
+    if tier == 0:
+        if has_battery == "Yes":
+            recommendations.append(f"🔋 **Excellent choice on the battery!** With export rates below {SEG_RATE_DECENT}p/kWh, storing energy for your own use (at {day_rate:.1f}p/kWh value) makes much more financial sense than exporting it. Your {BATTERY_CAPACITY}kWh battery will maximize your savings.")
+        else:
+            recommendations.append(f"🔋 **Strongly consider adding a battery.** Your export rate is only {seg_rate:.1f}p/kWh, but your grid electricity costs {day_rate:.1f}p/kWh. A {BATTERY_CAPACITY}kWh battery (£{BATTERY_COST:,}) would let you store excess daytime solar for evening use, significantly improving your return.")
     else:
-        return 8  # Default fallback
+        if has_battery == "Yes":
+            recommendations.append(f"🔋 **Battery adds value.** With a decent {seg_rate:.1f}p export rate, you're already getting good returns from exporting. Your {BATTERY_CAPACITY}kWh battery will boost self-use from {self_use_pct - BATTERY_SELF_USE_BOOST*100:.0f}% to {self_use_pct:.0f}%, further reducing grid reliance.")
+        else:
+            recommendations.append(f"🔋 **Battery is optional.** With a {seg_rate:.1f}p export rate, exporting to the grid is already quite profitable. A battery would increase self-use but may not dramatically improve payback given your good export terms.")
+    
+    # Export profitability
+    recommendations.append(SEG_RATE_MESSAGES[tier].format(seg_rate=seg_rate))
+    
+    return tuple(recommendations)
+
+def build_assumptions_markdown(results, num_panels, panel_wattage, roof_direction, has_shading,
+                               home_during_day, has_battery, day_rate, seg_rate, ev_increase_pct):
+    """
+    Markdown for the Calculation Details & Assumptions expander.
+    ev_increase_pct is the EV usage uplift in whole percent, or None without an EV.
+    """
+    base_generation = results['system_size_kwp'] * results['regional_yield']
+    panel_cost = num_panels * COST_PER_PANEL
+    
+    return f"""
+        **Calculation Steps:**
+        
+        1. **System Size:** kWp = ({num_panels} panels × {panel_wattage}W) ÷ 1,000 = **{results['system_size_kwp']:.1f} kWp**
+        
+        2. **Annual Generation:** 
+           - Base: {results['system_size_kwp']:.1f} kWp × {results['regional_yield']} kWh/kWp/year = {base_generation:,.0f} kWh
+           - Orientation factor: × {results['orientation_factor']:.2f} ({roof_direction})
+           - Shading factor: × {results['shading_factor']:.1f} ({'yes' if has_shading == 'Yes' else 'no shading'})
+           - **Final: {results['annual_generation']:,.0f} kWh/year**
+        
+        3. **Self-Use Calculation:**
+           - Base self-use: 45%
+           - Home during day: {'+10%' if home_during_day == 'Yes' else '—'}
+           - Battery storage: {f'+{BATTERY_SELF_USE_BOOST*100:.0f}%' if has_battery == 'Yes' else '—'}
+           - **Total self-use: {results['self_use_percent']*100:.0f}%** (capped at 90%)
+        
+        4. **Financial Benefits:**
+           - Self-used: {results['self_used_kwh']:,.0f} kWh × {day_rate:.1f}p/kWh = **£{results['savings']:,.0f}**
+           - Exported: {results['exported_kwh']:,.0f} kWh × {seg_rate:.1f}p/kWh = **£{results['export_income']:,.0f}**
+           - **Total annual value: £{results['total_annual_value']:,.0f}**
+        
+        5. **Installation Cost:**
+           - Fixed costs: £{FIXED_COST:,} (scaffolding, inverter, labor)
+           - Panel costs: {num_panels} panels × £{COST_PER_PANEL} = £{panel_cost:,}
+           - Battery: {'£' + str(BATTERY_COST) + f' ({BATTERY_CAPACITY}kWh)' if has_battery == 'Yes' else '—'}
+           - **Total: £{results['install_cost']:,.0f}**
+        
+        6. **Payback Period:** £{results['install_cost']:,.0f} ÷ £{results['total_annual_value']:,.0f}/year = **{results['payback_years']:.1f} years**
+        
+        ---
+        
+        **Key Assumptions:**
+        - Regional solar yield: {results['regional_yield']} kWh/kWp/year ({results['region_name']})
+        - Orientation multipliers: South = 1.0, SE/SW = 0.95, E/W = 0.85, NE/NW = 0.70, North = 0.6
+        - Shading impact: 10% reduction if present
+        - Panel wattage: {panel_wattage}W per panel
+        - Installation costs: £{FIXED_COST:,} fixed + £{COST_PER_PANEL}/panel (UK national average)
+        - Battery: {BATTERY_CAPACITY}kWh capacity, £{BATTERY_COST:,}, +{BATTERY_SELF_USE_BOOST*100:.0f}% self-use boost
+        - EV charging impact: {f'+{ev_increase_pct}% increase' if ev_increase_pct is not None else 'Not applicable'}
+        - System lifespan: 25 years (typical warranty period)
+        
+        These are estimates based on typical UK conditions. Actual results vary by location, 
+        shading, roof pitch, weather patterns, and installer quotes. Consult a certified MCS 
+        installer for a detailed site assessment and accurate pricing.
+        """
+
+# ============================================================================
+# CHART BUILDERS
+# ============================================================================
+# DEVELOPER NOTE: Figures are cached on their plotted values and labels, so repeat
+# calculations with the same inputs skip Plotly figure construction and validation.
+# The usage vs generation comparison is a native st.vega_lite_chart, not a Plotly
+# figure (see Results).
+
+@st.cache_resource(show_spinner=False, max_entries=128)
+def build_energy_pie(self_used_kwh, exported_kwh, self_use_label, export_label):
+    """
+    Donut chart splitting generation into self-used and exported energy.
+    Callers pass whole-kWh values; the shared cached figure must not be mutated.
+    """
+    # Trusted, constant payload built as plain dicts - avoids constructing and
+    # validating a graph object per trace/layout before the figure itself
+    return go.Figure({
+        'data': [{
+            'type': 'pie',
+            'labels': [self_use_label, export_label],
+            'values': [self_used_kwh, exported_kwh],
+            'marker': {'colors': ['#51CF66', '#FFA94D']},
+            'hole': 0.4,
+            'textinfo': 'label+percent',
+            'textposition': 'auto'
+        }],
+        'layout': {
+            'showlegend': True,
+            'height': 350,
+            'margin': {'t': 20, 'b': 20, 'l': 20, 'r': 20}
+        }
+    })
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def build_payback_heatmap(panel_wattage, regional_yield, shading_factor, self_use_percent,
+                          day_rate, seg_rate, battery_install_cost):
+    """Heatmap of payback years across every panel count and roof direction."""
+    # Imported lazily - plotly.express is heavy and only this optional chart needs it
+    import plotly.express as px
+    
+    panels = np.arange(MIN_PANELS, MAX_PANELS + 1)
+    grid = calc_roi_vec(
+        panels, panel_wattage, ORIENTATION_FACTORS_TUPLE, regional_yield, shading_factor,
+        self_use_percent, day_rate, seg_rate, battery_install_cost
+    )
+    
+    fig_heatmap = px.imshow(
+        grid['payback_years'],
+        x=list(ORIENTATION_OPTIONS),
+        y=[str(n) for n in panels],
+        labels=dict(x="Roof direction", y="Panels", color="Payback (years)"),
+        color_continuous_scale="RdYlGn_r",
+        text_auto=".1f",
+        aspect="auto"
+    )
+    fig_heatmap.update_layout(height=600, margin=dict(t=20, b=20, l=20, r=20))
+    
+    return fig_heatmap
 
 # ============================================================================
 # APP UI STARTS HERE
@@ -238,6 +474,9 @@ This is your first step toward more affordable energy for your home.
 
 st.divider()
 
+# Reference tables are bound once per rerun and passed to the lookup helpers
+tables = load_lookup_tables()
+
 # ============================================================================
 # SECTION 1: Property Information
 # ============================================================================
@@ -254,11 +493,14 @@ postcode = st.text_input(
     key="postcode_input"
 )
 
+# Normalise once - shared by the region lookup and the Google Maps link
+postcode_clean = postcode.translate(_POSTCODE_TABLE).strip()
+
 # Get regional yield based on postcode
-region_name, regional_yield = get_regional_yield(postcode)
+region_name, regional_yield = get_regional_yield(postcode_clean, tables)
 
 # Display regional information
-if postcode and postcode.strip() != "":
+if postcode_clean:
     st.info(f"📍 **Your area:** {region_name} ({regional_yield} kWh/kWp per year)")
 else:
     st.info(f"📍 Enter your postcode above for region-specific estimates (default: {BASE_YIELD} kWh/kWp per year)")
@@ -269,13 +511,14 @@ st.write("")
 col_roof1, col_roof2 = st.columns(2)
 
 with col_roof1:
-    # Start with no selection to encourage active participation
-    roof_options = ["Select your roof direction", "South", "South-East", "South-West", "East", "West", "North-East", "North-West", "North"]
-    
-    roof_direction_raw = st.selectbox(
+    # Start with no selection to encourage active participation. Options are
+    # positions in ORIENTATION_OPTIONS (None = placeholder), so the selection is
+    # already the index into ORIENTATION_FACTORS_TUPLE
+    roof_selection = st.selectbox(
         "Main Roof Direction",
-        roof_options,
+        (None, *range(len(ORIENTATION_OPTIONS))),
         index=0,
+        format_func=lambda idx: "Select your roof direction" if idx is None else ORIENTATION_OPTIONS[idx],
         help="South-facing roofs generate the most electricity",
         key="roof_direction_select"
     )
@@ -284,9 +527,10 @@ with col_roof1:
     st.caption("🧭 North ↑ | East → | South ↓ | West ←")
     
     # Google Maps satellite view link
-    if postcode and postcode.strip() != "":
-        postcode_encoded = postcode.strip().replace(" ", "+")
-        maps_url = f"https://maps.google.com/?q={postcode_encoded}&t=k&z=20"
+    if postcode_clean:
+        # Quoted so user input can't break out of the href; keeps the space between
+        # outward and inward codes (e.g. EH1%201AA)
+        maps_url = f"https://maps.google.com/?q={quote(postcode.strip().upper(), safe='')}&t=k&z=20"
         
         st.markdown(
             f'🗺️ <a href="{maps_url}" target="_blank">View your roof on Google Maps</a>',
@@ -304,13 +548,14 @@ with col_roof2:
     )
     st.caption("Shading from trees or nearby buildings can reduce efficiency by 5–20%.")
 
+# Shading factor computed once here and passed into the calculation
+shading_factor = 0.9 if has_shading == "Yes" else 1.0
+
 # DEVELOPER NOTE: Dynamic feedback appears only after direction selection
 # This creates a reactive "moment of insight" rather than static text
-if roof_direction_raw != "Select your roof direction":
-    roof_direction = roof_direction_raw
-    
-    # Get orientation factor
-    orientation_factor = ORIENTATION_FACTORS[roof_direction]
+if roof_selection is not None:
+    roof_idx = roof_selection
+    roof_direction = ORIENTATION_OPTIONS[roof_idx]
     
     # Provide contextual feedback based on selection
     if roof_direction == "South":
@@ -323,8 +568,11 @@ if roof_direction_raw != "Select your roof direction":
         st.info("☀️ Good choice — most directions still generate plenty of energy.")
 else:
     # Default to South for calculations if not selected
-    roof_direction = "South"
-    orientation_factor = ORIENTATION_FACTORS[roof_direction]
+    roof_direction = DEFAULT_ROOF_DIRECTION
+    roof_idx = DEFAULT_ROOF_IDX
+
+# Orientation factor computed once here and passed into the calculation
+orientation_factor = ORIENTATION_FACTORS_TUPLE[roof_idx]
 
 st.divider()
 
@@ -468,18 +716,12 @@ st.markdown("### 💷 Your Electricity Tariff")
 st.markdown("Tell us who supplies your electricity, and we'll fill in your export rate (SEG) for you.")
 
 # Load supplier data
-supplier_df = load_supplier_data()
+supplier_data = tables.supplier
 
-# Create supplier options
-if supplier_df is not None:
-    supplier_list = ["Select your supplier..."] + supplier_df['supplier'].tolist() + ["Other / Don't know"]
-else:
-    supplier_list = ["Select your supplier...", "Other / Don't know"]
-
-# Supplier selection
+# Supplier selection - options are prebuilt once in the cached lookup tables
 selected_supplier = st.selectbox(
     "Your Energy Supplier",
-    supplier_list,
+    tables.supplier_options,
     index=0,
     help="Select your supplier to auto-fill the export (SEG) rate",
     key="supplier_select"
@@ -493,15 +735,11 @@ if selected_supplier == "Other / Don't know":
     show_supplier_confirmation = False
     supplier_notes = None
 elif selected_supplier != "Select your supplier...":
-    supplier_seg_rate = get_seg_rate_for_supplier(selected_supplier)
+    supplier_seg_rate = get_seg_rate_for_supplier(selected_supplier, tables)
     show_supplier_confirmation = True
     
-    # Get supplier notes if available
-    supplier_notes = None
-    if supplier_df is not None:
-        supplier_info = supplier_df[supplier_df['supplier'] == selected_supplier]
-        if not supplier_info.empty:
-            supplier_notes = supplier_info.iloc[0]['notes']
+    # Every listed supplier has a table row, so its notes are always present
+    supplier_notes = supplier_data[selected_supplier][1]
 else:
     # No supplier selected yet - use default
     supplier_seg_rate = DEFAULT_SEG_RATE
@@ -521,7 +759,7 @@ seg_rate = st.number_input(
 )
 
 # Show supplier notes under SEG rate field for better context
-if supplier_notes and selected_supplier not in ["Select your supplier...", "Other / Don't know"]:
+if supplier_notes:
     st.caption(f"ℹ️ {selected_supplier}: {supplier_notes}")
 else:
     st.caption("Your SEG rate is what your supplier pays you for exporting solar power to the grid.")
@@ -573,16 +811,11 @@ st.markdown("Now let's configure your solar panel system.")
 
 # Home type selection (moved from Property Information)
 # DEVELOPER NOTE: Home type moved here because it directly influences system sizing
-home_type_df = load_home_type_data()
-
-if home_type_df is not None:
-    home_type_list = ["Select your home type"] + home_type_df['home_type'].tolist()
-else:
-    home_type_list = ["Select your home type", "Flat / Small home", "Terrace", "Semi-detached", "Detached", "Bungalow"]
+home_type_data = tables.home_type
 
 home_type_raw = st.selectbox(
     "Home Type",
-    home_type_list,
+    tables.home_type_options,
     index=0,
     help="This determines the recommended system size for your property",
     key="home_type_select"
@@ -597,15 +830,11 @@ if home_type_raw == "Select your home type":
 else:
     home_type_selected = True
     home_type = home_type_raw
-    min_panels_for_type = get_min_panels_for_home_type(home_type)
+    min_panels_for_type = get_min_panels_for_home_type(home_type, tables)
     
-    # Show home type notes if available
-    if home_type_df is not None:
-        home_info = home_type_df[home_type_df['home_type'] == home_type]
-        if not home_info.empty:
-            notes = home_info.iloc[0]['notes']
-            typical_kwp = home_info.iloc[0]['typical_kwp']
-            st.caption(f"ℹ️ {home_type}: {notes} (typical: {typical_kwp} kWp)")
+    # Show home type notes - every listed home type has a table row
+    _, typical_kwp, notes = home_type_data[home_type]
+    st.caption(f"ℹ️ {home_type}: {notes} (typical: {typical_kwp} kWp)")
 
 st.write("")
 
@@ -618,8 +847,8 @@ with col8:
     if home_type_selected:
         num_panels = st.slider(
             "Number of Solar Panels",
-            min_value=4,
-            max_value=24,
+            min_value=MIN_PANELS,
+            max_value=MAX_PANELS,
             value=min_panels_for_type,
             step=1,
             help=f"Recommended minimum for {home_type}: {min_panels_for_type} panels. Adjust based on your roof space.",
@@ -629,8 +858,8 @@ with col8:
         # Show disabled state when no home type selected
         st.slider(
             "Number of Solar Panels",
-            min_value=4,
-            max_value=24,
+            min_value=MIN_PANELS,
+            max_value=MAX_PANELS,
             value=0,
             step=1,
             disabled=True,
@@ -653,10 +882,11 @@ with col8:
         help="Modern panels are typically 400-460W. Check your quote for exact specs"
     )
     
-    # Calculate and display system size
+    # Calculate system size once - shared by this caption and the ROI calculation
+    system_size_kwp = (num_panels * panel_wattage) / 1000
+    
     if home_type_selected and num_panels > 0:
-        estimated_kwp = (num_panels * panel_wattage) / 1000
-        st.caption(f"Estimated system size: **{estimated_kwp:.1f} kWp** based on {num_panels} panels for a {home_type.lower()}.")
+        st.caption(f"Estimated system size: **{system_size_kwp:.1f} kWp** based on {num_panels} panels for a {home_type.lower()}.")
     elif not home_type_selected:
         st.caption("Select home type to see system size estimate")
 
@@ -675,78 +905,6 @@ with col9:
 
 st.divider()
 
-# ============================================================================
-# CALCULATION LOGIC
-# ============================================================================
-
-def calculate_solar_roi():
-    """
-    Calculate solar ROI metrics based on user inputs.
-    """
-    
-    # Step 1: Calculate system size in kWp
-    system_size_kwp = (num_panels * panel_wattage) / 1000
-    
-    # Step 2: Calculate annual generation using regional yield, orientation, and shading
-    orientation_factor = ORIENTATION_FACTORS[roof_direction]
-    shading_factor = 0.9 if has_shading == "Yes" else 1.0
-    annual_generation = system_size_kwp * regional_yield * orientation_factor * shading_factor
-    
-    # Step 3: Calculate self-use percentage
-    # DEVELOPER NOTE: Battery significantly increases self-use by storing excess daytime generation
-    self_use_percent = 0.45
-    
-    if home_during_day == "Yes":
-        self_use_percent += 0.10
-    
-    if has_battery == "Yes":
-        self_use_percent += BATTERY_SELF_USE_BOOST  # 25% boost with battery
-    
-    self_use_percent = min(0.90, self_use_percent)
-    
-    # Calculate self-used and exported energy
-    self_used_kwh = annual_generation * self_use_percent
-    exported_kwh = annual_generation - self_used_kwh
-    
-    # Step 4: Calculate financial benefits
-    savings = self_used_kwh * (day_rate / 100)
-    export_income = exported_kwh * (seg_rate / 100)
-    total_annual_value = savings + export_income
-    
-    # Step 5: Calculate installation cost (scaled by panel count)
-    # DEVELOPER NOTE: Linear cost model - fixed baseline + per-panel variable cost
-    panel_install_cost = FIXED_COST + (num_panels * COST_PER_PANEL)
-    battery_install_cost = BATTERY_COST if has_battery == "Yes" else 0
-    install_cost = panel_install_cost + battery_install_cost
-    
-    # Step 6: Calculate payback period
-    if total_annual_value > 0:
-        payback_years = install_cost / total_annual_value
-    else:
-        payback_years = 0
-    
-    export_percent = 1 - self_use_percent
-    
-    return {
-        'system_size_kwp': system_size_kwp,
-        'annual_generation': annual_generation,
-        'self_used_kwh': self_used_kwh,
-        'exported_kwh': exported_kwh,
-        'self_use_percent': self_use_percent,
-        'export_percent': export_percent,
-        'savings': savings,
-        'export_income': export_income,
-        'total_annual_value': total_annual_value,
-        'install_cost': install_cost,
-        'panel_install_cost': panel_install_cost,
-        'battery_install_cost': battery_install_cost,
-        'payback_years': payback_years,
-        'orientation_factor': orientation_factor,
-        'shading_factor': shading_factor,
-        'regional_yield': regional_yield,
-        'region_name': region_name
-    }
-
 # ============================================================================
 # SECTION 5: Results
 # ============================================================================
@@ -756,28 +914,39 @@ cta = schema.get("cta", {}) if schema else {}
 cta_label = cta.get("label", "Calculate My Solar Savings")
 cta_subtext = cta.get("subtext", "")
 
-if st.button(cta_label, type="primary", use_container_width=True):
+# DEVELOPER NOTE: Results run as a fragment - clicking the CTA reruns only this
+# block instead of replaying every input section above. Inputs are read from the
+# script-level values of the last full run, which any input change refreshes.
+@st.fragment
+def render_results():
+    """Render the CTA button and, once clicked, the full results panel."""
+    if st.button(cta_label, type="primary", use_container_width=True):
+        st.session_state["_results_shown"] = True
+    
+    if not st.session_state.get("_results_shown"):
+        return
     
     # Check if schema is loaded
     if schema is None:
         st.error("Cannot display results without results_schema_min.json")
-        st.stop()
+        return
     
-    # Perform calculations
-    results = calculate_solar_roi()
+    # DEVELOPER NOTE: No home type means no panels - every result would be zero,
+    # so skip the calculation and charts and prompt for the missing input instead
+    if num_panels == 0:
+        st.warning("Please select your home type so we can size your system.")
+        return
     
     # Perform calculations
-    results = calculate_solar_roi()
-    
-    # DEVELOPER NOTE: Auto-scroll to results for mobile UX - critical for visibility
-    # Users on mobile need to see results immediately after clicking calculate button
-    # Using HTML anchor + JavaScript for cross-platform scroll behavior
-    st.markdown('<div id="results-section"></div>', unsafe_allow_html=True)
-    st.markdown("""
-        <script>
-            document.getElementById('results-section').scrollIntoView({behavior: 'smooth', block: 'start'});
-        </script>
-    """, unsafe_allow_html=True)
+    results = calculate_solar_roi(
+        num_panels, system_size_kwp, orientation_factor, shading_factor, regional_yield,
+        region_name, home_during_day, has_battery, day_rate, seg_rate
+    )
+    
+    # Percentages and daily value reused across metrics, summary and assumptions
+    self_use_pct = results['self_use_percent'] * 100
+    export_pct = results['export_percent'] * 100
+    daily_value = results['total_annual_value'] / 365
     
     st.divider()
     
@@ -809,7 +978,7 @@ if st.button(cta_label, type="primary", use_container_width=True):
         metric = metrics_config.get('use', {'label': 'Use (in your home)', 'unit': '%'})
         st.metric(
             metric['label'],
-            f"{results['self_use_percent']*100:.0f}{metric['unit']}",
+            f"{self_use_pct:.0f}{metric['unit']}",
             help=schema['tooltips'].get('use', '')
         )
     
@@ -843,52 +1012,49 @@ if st.button(cta_label, type="primary", use_container_width=True):
         chart_config = schema['charts']['usage_vs_generation']
         st.markdown(f"**{chart_config['title']}**")
         
-        comparison_data = {
-            'Category': [chart_config['x_labels']['usage'], chart_config['x_labels']['solar']],
-            'kWh': [annual_usage, results['annual_generation']]
-        }
-        
-        fig_bar = go.Figure()
-        fig_bar.add_trace(go.Bar(
-            x=comparison_data['Category'],
-            y=comparison_data['kWh'],
-            marker_color=['#FF6B6B', '#4ECDC4'],
-            text=[f"{val:,.0f} kWh" for val in comparison_data['kWh']],
-            textposition='outside'
-        ))
-        
-        fig_bar.update_layout(
-            yaxis_title=chart_config['y_label'],
-            showlegend=False,
-            height=350,
-            margin=dict(t=20, b=20, l=20, r=20)
-        )
+        # DEVELOPER NOTE: Two-bar comparison is a native st.vega_lite_chart, which is
+        # much lighter to build and send than a Plotly figure. st.bar_chart isn't used
+        # because its colour column can't pin each bar's colour or add value labels;
+        # the colour scale below maps usage and solar to fixed colours explicitly.
+        usage_label = chart_config['x_labels']['usage']
+        solar_label = chart_config['x_labels']['solar']
+        comparison_values = [
+            {'Category': label, 'kWh': round(kwh), 'Label': f"{kwh:,.0f} kWh"}
+            for label, kwh in ((usage_label, annual_usage), (solar_label, results['annual_generation']))
+        ]
         
-        st.plotly_chart(fig_bar, use_container_width=True)
+        st.vega_lite_chart({
+            'data': {'values': comparison_values},
+            'height': 350,
+            'encoding': {
+                'x': {'field': 'Category', 'type': 'nominal', 'sort': None, 'title': None, 'axis': {'labelAngle': 0}},
+                'y': {'field': 'kWh', 'type': 'quantitative', 'title': chart_config['y_label']}
+            },
+            'layer': [
+                {
+                    'mark': 'bar',
+                    'encoding': {'color': {
+                        'field': 'Category',
+                        'type': 'nominal',
+                        'scale': {'domain': [usage_label, solar_label], 'range': ['#FF6B6B', '#4ECDC4']},
+                        'legend': None
+                    }}
+                },
+                {
+                    'mark': {'type': 'text', 'baseline': 'bottom', 'dy': -4},
+                    'encoding': {'text': {'field': 'Label', 'type': 'nominal'}}
+                }
+            ]
+        }, use_container_width=True)
     
     with col_chart2:
         chart_config = schema['charts']['self_use_vs_export']
         st.markdown(f"**{chart_config['title']}**")
         
-        energy_split = {
-            'Type': [chart_config['legend']['self_use'], chart_config['legend']['export']],
-            'kWh': [results['self_used_kwh'], results['exported_kwh']],
-            'Percentage': [results['self_use_percent']*100, results['export_percent']*100]
-        }
-        
-        fig_pie = go.Figure(data=[go.Pie(
-            labels=energy_split['Type'],
-            values=energy_split['kWh'],
-            marker_colors=['#51CF66', '#FFA94D'],
-            hole=0.4,
-            textinfo='label+percent',
-            textposition='auto'
-        )])
-        
-        fig_pie.update_layout(
-            showlegend=True,
-            height=350,
-            margin=dict(t=20, b=20, l=20, r=20)
+        # Rounded to whole kWh so sub-unit float jitter still hits the figure cache
+        fig_pie = build_energy_pie(
+            round(results['self_used_kwh']), round(results['exported_kwh']),
+            chart_config['legend']['self_use'], chart_config['legend']['export']
         )
         
         st.plotly_chart(fig_pie, use_container_width=True)
@@ -899,26 +1065,29 @@ if st.button(cta_label, type="primary", use_container_width=True):
     detail_config = schema['solar_detail']
     with st.expander(detail_config['title'], expanded=False):
         st.caption("Here's how we calculated your savings, in case you want to look under the hood.")
-        st.write("")
-        
-        detail_col1, detail_col2 = st.columns(2)
         
         fields = detail_config['fields']
         
-        with detail_col1:
-            st.metric("System Size", f"{results['system_size_kwp']:.1f} kWp")
-            st.metric(fields['self_use_kwh'], f"{results['self_used_kwh']:,.0f}")
-            st.caption("Used in your home")
-            st.metric(fields['self_use_savings'], f"£{results['savings']:,.0f}")
+        if results['battery_install_cost'] > 0:
+            install_note = f"💰 Panels: £{results['panel_install_cost']:,.0f} + Battery: £{results['battery_install_cost']:,.0f}"
+        else:
+            install_note = "💰 Estimated installation cost (UK national average)"
         
-        with detail_col2:
-            st.metric(fields['install_cost'], f"£{results['install_cost']:,.0f}")
-            if results['battery_install_cost'] > 0:
-                st.caption(f"💰 Panels: £{results['panel_install_cost']:,.0f} + Battery: £{results['battery_install_cost']:,.0f}")
-            else:
-                st.caption("💰 Estimated installation cost (UK national average)")
-            st.metric("Exported to Grid", f"{results['exported_kwh']:,.0f} kWh")
-            st.metric(fields['export_earnings'], f"£{results['export_income']:,.0f}")
+        # DEVELOPER NOTE: One HTML table instead of six st.metric calls - a single
+        # element to serialise and send per render. Headline metrics above keep st.metric.
+        detail_rows = [
+            ("System Size", f"{results['system_size_kwp']:.1f} kWp", ""),
+            (fields['self_use_kwh'], f"{results['self_used_kwh']:,.0f}", "Used in your home"),
+            (fields['self_use_savings'], f"£{results['savings']:,.0f}", ""),
+            (fields['install_cost'], f"£{results['install_cost']:,.0f}", install_note),
+            ("Exported to Grid", f"{results['exported_kwh']:,.0f} kWh", ""),
+            (fields['export_earnings'], f"£{results['export_income']:,.0f}", "")
+        ]
+        detail_html = "".join(
+            f"<tr><td>{html.escape(label)}</td><td><strong>{value}</strong></td><td>{html.escape(note)}</td></tr>"
+            for label, value, note in detail_rows
+        )
+        st.markdown(f"<table>{detail_html}</table>", unsafe_allow_html=True)
     
     st.divider()
     
@@ -932,13 +1101,13 @@ if st.button(cta_label, type="primary", use_container_width=True):
     summary_text = f"""
 Your **{num_panels}-panel system ({results['system_size_kwp']:.1f} kWp)** would generate around **{results['annual_generation']:,.0f} kWh per year** — roughly **{coverage_percent:.0f}%** of your current electricity use.
 
-🔹 **Use:** {results['self_use_percent']*100:.0f}% of that power goes straight into your home (≈ {results['self_used_kwh']:,.0f} kWh).  
+🔹 **Use:** {self_use_pct:.0f}% of that power goes straight into your home (≈ {results['self_used_kwh']:,.0f} kWh).  
 🔹 **Save:** That cuts your annual electricity bill by about **£{results['savings']:,.0f}**.  
-🔹 **Earn:** The rest ({results['export_percent']*100:.0f}%) is **sold back to the grid**, earning you around **£{results['export_income']:,.0f}**.
+🔹 **Earn:** The rest ({export_pct:.0f}%) is **sold back to the grid**, earning you around **£{results['export_income']:,.0f}**.
 
 💰 **Total annual benefit: £{results['total_annual_value']:,.0f}**  
 💡 **Estimated installation cost: £{results['install_cost']:,.0f}** (UK average)  
-🌤️ **Simple payback:** Around **{results['payback_years']:.1f} years** — after which your system keeps saving and earning, the equivalent of **£{results['total_annual_value']/365:.2f}–£{(results['total_annual_value']/365)*1.3:.2f} a day** in passive income.
+🌤️ **Simple payback:** Around **{results['payback_years']:.1f} years** — after which your system keeps saving and earning, the equivalent of **£{daily_value:.2f}–£{daily_value*1.3:.2f} a day** in passive income.
 """
     
     st.success(summary_text)
@@ -946,88 +1115,39 @@ Your **{num_panels}-panel system ({results['system_size_kwp']:.1f} kWp)** would
     # Intelligent recommendations (keep existing hardcoded logic for now as not in JSON)
     st.markdown("### 💡 Our Recommendation")
     
-    recommendations = []
-    
-    # Payback assessment
-    if results['payback_years'] < 7:
-        recommendations.append("✅ **Excellent payback period!** Your system would pay for itself in under 7 years, which is considered very good for UK solar installations. This is a solid investment.")
-    elif results['payback_years'] < 10:
-        recommendations.append("👍 **Good payback period.** Your system would pay for itself in under 10 years, making it a worthwhile long-term investment.")
-    else:
-        recommendations.append("⚠️ **Long payback period.** With a payback of over 10 years, you may want to consider adjusting your system size or waiting for better tariff rates.")
-    
-    # Battery recommendation
-    if seg_rate < 15:
-        if has_battery == "Yes":
-            recommendations.append(f"🔋 **Excellent choice on the battery!** With export rates below 15p/kWh, storing energy for your own use (at {day_rate:.1f}p/kWh value) makes much more financial sense than exporting it. Your {BATTERY_CAPACITY}kWh battery will maximize your savings.")
-        else:
-            recommendations.append(f"🔋 **Strongly consider adding a battery.** Your export rate is only {seg_rate:.1f}p/kWh, but your grid electricity costs {day_rate:.1f}p/kWh. A {BATTERY_CAPACITY}kWh battery (£{BATTERY_COST:,}) would let you store excess daytime solar for evening use, significantly improving your return.")
-    else:
-        if has_battery == "Yes":
-            recommendations.append(f"🔋 **Battery adds value.** With a decent {seg_rate:.1f}p export rate, you're already getting good returns from exporting. Your {BATTERY_CAPACITY}kWh battery will boost self-use from {(results['self_use_percent']-BATTERY_SELF_USE_BOOST)*100:.0f}% to {results['self_use_percent']*100:.0f}%, further reducing grid reliance.")
-        else:
-            recommendations.append(f"🔋 **Battery is optional.** With a {seg_rate:.1f}p export rate, exporting to the grid is already quite profitable. A battery would increase self-use but may not dramatically improve payback given your good export terms.")
-    
-    # Export profitability
-    if seg_rate >= 20:
-        recommendations.append("💰 **Great export rate!** At {:.1f}p/kWh, exporting your surplus energy to the grid is highly profitable. You're getting good value for every kWh you don't use.".format(seg_rate))
-    elif seg_rate >= 15:
-        recommendations.append("💰 **Decent export rate.** At {:.1f}p/kWh, exporting surplus energy is still worthwhile, though not as lucrative as the best tariffs available.".format(seg_rate))
-    else:
-        recommendations.append("💰 **Low export rate.** At {:.1f}p/kWh, your SEG rate is below average. Consider shopping around for better export tariffs or maximizing self-use with a battery.".format(seg_rate))
+    recommendations = build_recommendations(
+        results['payback_years'], self_use_pct, seg_rate, day_rate, has_battery
+    )
     
     for rec in recommendations:
         st.markdown(rec)
         st.write("")
     
+    # DEVELOPER NOTE: Sensitivity grid reuses the user's yield, shading, self-use and
+    # rates, sweeping panel count × roof direction in one vectorised calculation.
+    # Built only on request - an expander body would run (and ship the figure) on
+    # every click even while collapsed. The toggle reruns just this fragment.
+    if st.toggle("📉 Show payback sensitivity", key="show_payback_sensitivity"):
+        st.caption("How your payback period changes with panel count and roof direction, keeping everything else the same.")
+        fig_heatmap = build_payback_heatmap(
+            panel_wattage, results['regional_yield'], results['shading_factor'], results['self_use_percent'],
+            day_rate, seg_rate, results['battery_install_cost']
+        )
+        st.plotly_chart(fig_heatmap, use_container_width=True)
+    
     # Assumptions note (keep existing detailed assumptions)
     with st.expander("ℹ️ Calculation Details & Assumptions"):
-        st.markdown(f"""
-        **Calculation Steps:**
-        
-        1. **System Size:** kWp = ({num_panels} panels × {panel_wattage}W) ÷ 1,000 = **{results['system_size_kwp']:.1f} kWp**
-        
-        2. **Annual Generation:** 
-           - Base: {results['system_size_kwp']:.1f} kWp × {results['regional_yield']} kWh/kWp/year = {results['system_size_kwp'] * results['regional_yield']:,.0f} kWh
-           - Orientation factor: × {results['orientation_factor']:.2f} ({roof_direction})
-           - Shading factor: × {results['shading_factor']:.1f} ({'yes' if has_shading == 'Yes' else 'no shading'})
-           - **Final: {results['annual_generation']:,.0f} kWh/year**
-        
-        3. **Self-Use Calculation:**
-           - Base self-use: 45%
-           - Home during day: {'+10%' if home_during_day == 'Yes' else '—'}
-           - Battery storage: {f'+{BATTERY_SELF_USE_BOOST*100:.0f}%' if has_battery == 'Yes' else '—'}
-           - **Total self-use: {results['self_use_percent']*100:.0f}%** (capped at 90%)
-        
-        4. **Financial Benefits:**
-           - Self-used: {results['self_used_kwh']:,.0f} kWh × {day_rate:.1f}p/kWh = **£{results['savings']:,.0f}**
-           - Exported: {results['exported_kwh']:,.0f} kWh × {seg_rate:.1f}p/kWh = **£{results['export_income']:,.0f}**
-           - **Total annual value: £{results['total_annual_value']:,.0f}**
-        
-        5. **Installation Cost:**
-           - Fixed costs: £{FIXED_COST:,} (scaffolding, inverter, labor)
-           - Panel costs: {num_panels} panels × £{COST_PER_PANEL} = £{num_panels * COST_PER_PANEL:,}
-           - Battery: {'£' + str(BATTERY_COST) + f' ({BATTERY_CAPACITY}kWh)' if has_battery == 'Yes' else '—'}
-           - **Total: £{results['install_cost']:,.0f}**
-        
-        6. **Payback Period:** £{results['install_cost']:,.0f} ÷ £{results['total_annual_value']:,.0f}/year = **{results['payback_years']:.1f} years**
-        
-        ---
-        
-        **Key Assumptions:**
-        - Regional solar yield: {results['regional_yield']} kWh/kWp/year ({results['region_name']})
-        - Orientation multipliers: South = 1.0, SE/SW = 0.95, E/W = 0.85, NE/NW = 0.70, North = 0.6
-        - Shading impact: 10% reduction if present
-        - Panel wattage: {panel_wattage}W per panel
-        - Installation costs: £{FIXED_COST:,} fixed + £{COST_PER_PANEL}/panel (UK national average)
-        - Battery: {BATTERY_CAPACITY}kWh capacity, £{BATTERY_COST:,}, +{BATTERY_SELF_USE_BOOST*100:.0f}% self-use boost
-        - EV charging impact: {'+' + str(int((EV_MULTIPLIERS[st.session_state.usage_type]-1)*100)) + '% increase' if has_ev == 'Yes' else 'Not applicable'}
-        - System lifespan: 25 years (typical warranty period)
-        
-        These are estimates based on typical UK conditions. Actual results vary by location, 
-        shading, roof pitch, weather patterns, and installer quotes. Consult a certified MCS 
-        installer for a detailed site assessment and accurate pricing.
-        """)
+        ev_increase_pct = int((EV_MULTIPLIERS[st.session_state.usage_type] - 1) * 100) if has_ev == 'Yes' else None
+        st.markdown(build_assumptions_markdown(
+            results, num_panels, panel_wattage, roof_direction, has_shading,
+            home_during_day, has_battery, day_rate, seg_rate, ev_increase_pct
+        ))
+
+# A full rerun means an input changed, so results stay hidden until Calculate is
+# clicked again. Fragment reruns (the CTA, the sensitivity toggle) skip this line.
+st.session_state["_results_shown"] = False
+render_results()
+
 # Footer
 st.divider()
 st.caption("☀️ Solar ROI Calculator | For estimation purposes only | Data based on UK averages")
\ No newline at end of file
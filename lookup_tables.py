@@ -0,0 +1,48 @@
+"""
+Process-wide lookup tables for the Solar ROI Calculator (UK).
+
+Lives outside app.py because Streamlit re-executes app.py on every rerun,
+which would reset any module-level state defined there. Imported modules are
+loaded once per process, so the tables here are built once and shared by all
+sessions.
+"""
+
+import threading
+from dataclasses import dataclass
+
+from data_tables import REGIONS, SUPPLIERS, HOME_TYPES
+
+@dataclass(frozen=True, slots=True, eq=False)
+class LookupTables:
+    """Reference tables keyed for O(1) lookups. Callers must not mutate the dicts."""
+    region: dict  # prefix -> (region_name, yield_value)
+    supplier: dict  # supplier -> (seg_rate, notes)
+    home_type: dict  # home_type -> (min_panels, typical_kwp, notes)
+    supplier_options: tuple  # supplier selectbox options, placeholders included
+    home_type_options: tuple  # home type selectbox options, placeholder included
+
+def _build_lookup_tables():
+    """Wrap the embedded reference tables from data_tables.py in a LookupTables."""
+    return LookupTables(
+        region=REGIONS,
+        supplier=SUPPLIERS,
+        home_type=HOME_TYPES,
+        supplier_options=("Select your supplier...", *SUPPLIERS, "Other / Don't know"),
+        home_type_options=("Select your home type", *HOME_TYPES)
+    )
+
+_tables = None
+_tables_lock = threading.Lock()
+
+def load_lookup_tables():
+    """
+    Return the shared LookupTables, building it on first use.
+    Streamlit runs sessions on a thread pool, so the first build is guarded by
+    a lock; every later call is a single global read.
+    """
+    global _tables
+    if _tables is None:
+        with _tables_lock:
+            if _tables is None:
+                _tables = _build_lookup_tables()
+    return _tables